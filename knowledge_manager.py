@@ -22,6 +22,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Oldest manual entries are evicted beyond this many
+MAX_MANUAL_ENTRIES = 10_000
+
 class KnowledgeManager:
     def __init__(self, knowledge_file="knowledge_base.json"):
         self.knowledge_file = knowledge_file
@@ -36,7 +39,7 @@ class KnowledgeManager:
             else:
                 return self.create_default_knowledge_base()
         except Exception as e:
-            logger.error(f"Error loading knowledge base: {e}")
+            logger.error("Error loading knowledge base: %s", e)
             return self.create_default_knowledge_base()
     
     def create_default_knowledge_base(self) -> Dict[str, Any]:
@@ -50,14 +53,18 @@ class KnowledgeManager:
             "sources": []
         }
     
-    def save_knowledge_base(self):
-        """Save knowledge base to file"""
+    def save_knowledge_base(self) -> bool:
+        """Save knowledge base to file, replacing it atomically; return whether the save succeeded"""
+        temp_file = f"{self.knowledge_file}.tmp"
         try:
-            with open(self.knowledge_file, 'w', encoding='utf-8') as f:
+            with open(temp_file, 'w', encoding='utf-8') as f:
                 json.dump(self.knowledge_base, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, self.knowledge_file)
             logger.info("Knowledge base saved successfully")
+            return True
         except Exception as e:
-            logger.error(f"Error saving knowledge base: {e}")
+            logger.error("Error saving knowledge base: %s", e)
+            return False
     
     async def scrape_url(self, url: str, max_depth: int = 1) -> Dict[str, Any]:
         """Scrape content from a URL"""
@@ -117,13 +124,13 @@ class KnowledgeManager:
                             "title": content["title"]
                         })
                         
-                        logger.info(f"Successfully scraped: {url}")
+                        logger.info("Successfully scraped: %s", url)
                         return content
                     else:
-                        logger.error(f"Failed to scrape {url}: HTTP {response.status}")
+                        logger.error("Failed to scrape %s: HTTP %s", url, response.status)
                         return {}
         except Exception as e:
-            logger.error(f"Error scraping {url}: {e}")
+            logger.error("Error scraping %s: %s", url, e)
             return {}
     
     def process_pdf_document(self, file_content: bytes, filename: str) -> Dict[str, Any]:
@@ -167,11 +174,11 @@ class KnowledgeManager:
                 "title": filename
             })
             
-            logger.info(f"Successfully processed PDF: {filename}")
+            logger.info("Successfully processed PDF: %s", filename)
             return doc_info
             
         except Exception as e:
-            logger.error(f"Error processing PDF {filename}: {e}")
+            logger.error("Error processing PDF %s: %s", filename, e)
             # Return a basic record even if processing fails
             return {
                 "filename": filename,
@@ -219,11 +226,11 @@ class KnowledgeManager:
                 "title": filename
             })
             
-            logger.info(f"Successfully processed DOCX: {filename}")
+            logger.info("Successfully processed DOCX: %s", filename)
             return doc_info
             
         except Exception as e:
-            logger.error(f"Error processing DOCX {filename}: {e}")
+            logger.error("Error processing DOCX %s: %s", filename, e)
             # Return a basic record even if processing fails
             return {
                 "filename": filename,
@@ -233,6 +240,49 @@ class KnowledgeManager:
                 "error": str(e)
             }
     
+    def add_manual_entry(self, title: str, content: str) -> bool:
+        """Add a manually entered knowledge entry and persist it; the in-memory state only changes if the save succeeds"""
+        # Entries are stored as bare content strings; the bucket implies the type.
+        # Re-adding a title moves it to the end so eviction drops the oldest entries.
+        previous = {key: self.knowledge_base.get(key) for key in ("manual_entries", "sources")}
+        manual_entries = dict(previous["manual_entries"] or {})
+        sources = list(previous["sources"] or [])
+        
+        is_new = manual_entries.pop(title, None) is None
+        manual_entries[title] = content
+        evicted = set()
+        while len(manual_entries) > MAX_MANUAL_ENTRIES:
+            oldest = next(iter(manual_entries))
+            manual_entries.pop(oldest)
+            evicted.add(oldest)
+        
+        # Drop the source records of evicted entries so sources stays bounded too
+        if evicted:
+            sources = [
+                source for source in sources
+                if not (source.get("type") == "manual" and source.get("source") in evicted)
+            ]
+        
+        if is_new:
+            sources.append({
+                "type": "manual",
+                "source": title,
+                "title": title
+            })
+        
+        self.knowledge_base["manual_entries"] = manual_entries
+        self.knowledge_base["sources"] = sources
+        if not self.save_knowledge_base():
+            for key, value in previous.items():
+                if value is None:
+                    self.knowledge_base.pop(key, None)
+                else:
+                    self.knowledge_base[key] = value
+            return False
+        
+        logger.info("Added manual entry: %s", title)
+        return True
+    
     def search_knowledge(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         """Search through knowledge base for relevant information"""
         results = []
@@ -290,6 +340,26 @@ class KnowledgeManager:
                     "content": doc_info
                 })
         
+        # Search manual entries
+        for title, content in self.knowledge_base.get("manual_entries", {}).items():
+            relevance_score = 0
+            
+            # Check title
+            if query_lower in title.lower():
+                relevance_score += 3
+            
+            # Check content
+            relevance_score += content.lower().count(query_lower)
+            
+            if relevance_score > 0:
+                results.append({
+                    "type": "manual",
+                    "source": title,
+                    "title": title,
+                    "relevance": relevance_score,
+                    "content": {"content": content}
+                })
+        
         # Sort by relevance and return top results
         results.sort(key=lambda x: x["relevance"], reverse=True)
         return results[:max_results]
@@ -323,9 +393,10 @@ class KnowledgeManager:
                     context_parts.append("Relevant content:")
                     context_parts.extend(relevant_paragraphs[:3])  # Limit to 3 paragraphs
             
-            elif result["type"] == "document":
+            elif result["type"] in ("document", "manual"):
                 doc_info = result["content"]
-                context_parts.append(f"\nFrom document {result['source']}:")
+                label = "document" if result["type"] == "document" else "manual entry"
+                context_parts.append(f"\nFrom {label} {result['source']}:")
                 
                 # Add relevant content snippets
                 content = doc_info.get("content", "")
@@ -353,6 +424,7 @@ class KnowledgeManager:
         return {
             "scraped_urls": len(self.knowledge_base.get("scraped_urls", {})),
             "uploaded_documents": len(self.knowledge_base.get("uploaded_documents", {})),
+            "manual_entries": len(self.knowledge_base.get("manual_entries", {})),
             "total_sources": len(self.knowledge_base.get("sources", [])),
             "last_updated": self.knowledge_base.get("last_updated", "Never")
         }
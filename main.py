@@ -1,49 +1,370 @@
 import discord
 from discord.ext import commands
 import asyncio
+import functools
+import hashlib
 import logging
+import math
 import os
+import pathlib
 from dotenv import load_dotenv
 import io
 import json
-import tempfile
 import re
+import signal
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Tuple
 
-# AI Libraries with Nano Banana support
-try:
-    from google import genai
+# AI SDKs and Pillow are imported on first use: they pull in gRPC/protobuf/codecs
+# and most sessions only ever touch one provider
+@functools.lru_cache(maxsize=None)
+def _get_genai():
+    """Import the google-genai (Nano Banana) SDK on first use; None when it is not installed"""
+    try:
+        from google import genai
+    except ImportError:
+        return None
+    return genai
+
+@functools.lru_cache(maxsize=None)
+def _get_genai_types():
+    """Import google-genai request types on first use"""
     from google.genai import types
-    NANO_BANANA_AVAILABLE = True
-except ImportError:
+    return types
+
+@functools.lru_cache(maxsize=None)
+def _get_legacy_genai():
+    """Import the legacy google-generativeai SDK on first use; None when it is not installed"""
     try:
         import google.generativeai as genai
-        types = None
-        NANO_BANANA_AVAILABLE = False
     except ImportError:
-        genai = None
-        types = None
-        NANO_BANANA_AVAILABLE = False
+        return None
+    return genai
 
-try:
-    import openai
-except ImportError:
-    openai = None
+def nano_banana_available() -> bool:
+    """Whether the google-genai SDK with Nano Banana support is installed"""
+    return _get_genai() is not None
 
-try:
-    from PIL import Image
-except ImportError:
-    Image = None
+@functools.lru_cache(maxsize=None)
+def _get_openai():
+    """Import the OpenAI SDK on first use; None when it is not installed"""
+    try:
+        import openai
+    except ImportError:
+        return None
+    return openai
+
+@functools.lru_cache(maxsize=None)
+def _get_pil():
+    """Import Pillow's Image module on first use; None when Pillow is not installed"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
 
 # Knowledge management
 from knowledge_manager import KnowledgeManager
+from semantic_cache import SemanticCache, SEMANTIC_CACHE_AVAILABLE, compress_text, decompress_text
 
 # Load environment variables
-load_dotenv()
+@functools.lru_cache(maxsize=1)
+def _loaded_env() -> dict:
+    """Parse .env once and snapshot the environment for the process lifetime"""
+    load_dotenv()
+    return os.environ.copy()
+
+_ENV = _loaded_env()
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Brand DNA prompt; kept in a text file so it can be edited and reloaded (`!sv reload_brand`) without a deploy
+BRAND_DNA_PATH = pathlib.Path(__file__).parent / 'brand' / 'brand_dna.txt'
+
+def load_brand_dna() -> str:
+    """Read the Modern Weave™ brand DNA prompt"""
+    return BRAND_DNA_PATH.read_text(encoding='utf-8')
+
+# Modern Weave™ default palette
+DEFAULT_PRIMARY = 0x1888FF    # SV Core Blue
+DEFAULT_SECONDARY = 0xF8F8EB  # Alabaster
+DEFAULT_ACCENT = 0x004B8D     # Deep Blue
+DEFAULT_NEUTRAL = 0x231F20    # Ink Black
+
+_HEX_COLOR_RE = re.compile(r'#?([0-9A-Fa-f]{6})')
+
+@functools.lru_cache(maxsize=16)
+def parse_color(color_str, default: int) -> int:
+    """Parse a '#RRGGBB' color string, falling back to an already-parsed default"""
+    match = _HEX_COLOR_RE.fullmatch(color_str.strip()) if color_str else None
+    return int(match.group(1), 16) if match else default
+
+# Brand colors are parsed once at import; the environment is fixed for the process lifetime
+PRIMARY_COLOR = parse_color(_ENV.get('BRAND_PRIMARY_COLOR'), DEFAULT_PRIMARY)
+SECONDARY_COLOR = parse_color(_ENV.get('BRAND_SECONDARY_COLOR'), DEFAULT_SECONDARY)
+ACCENT_COLOR = parse_color(_ENV.get('BRAND_ACCENT_COLOR'), DEFAULT_ACCENT)
+NEUTRAL_COLOR = parse_color(_ENV.get('BRAND_NEUTRAL_COLOR'), DEFAULT_NEUTRAL)
+
+@dataclass(frozen=True)
+class BrandConfig:
+    """Modern Weave™ brand settings, fixed for the process lifetime"""
+    name: str
+    primary_color: int
+    secondary_color: int
+    accent_color: int
+    neutral_color: int
+    sub_brand_colors: Dict[str, int]
+    style_guidelines: str
+    voice_tone: str
+    brandline: str
+    core_beliefs: Tuple[str, ...]
+    typography: Dict[str, str]
+
+def _request_key(*parts) -> str:
+    """Stable SHA-256 key for a set of JSON-serializable request arguments"""
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def _encode_png(data: bytes) -> bytes:
+    """Re-encode image bytes as PNG (CPU-bound; run via asyncio.to_thread)"""
+    image = _get_pil().open(io.BytesIO(data))
+    buffer = io.BytesIO()
+    image.save(buffer, 'PNG', optimize=False)
+    return buffer.getvalue()
+
+def _split_at_breaks(text: str, size: int, limit: int):
+    """Split text into at most `limit` chunks of up to `size` chars, preferring line then word breaks.
+    Returns (chunks, consumed) where consumed is how far into text the chunks reach."""
+    chunks = []
+    start = 0
+    while start < len(text) and len(chunks) < limit:
+        end = min(start + size, len(text))
+        if end < len(text):
+            # Only accept a break in the back half of the window so chunks stay reasonably full
+            floor = start + size // 2
+            cut = text.rfind('\n', floor, end)
+            if cut == -1:
+                cut = text.rfind(' ', floor, end)
+            end = cut if cut != -1 else end
+        chunks.append(text[start:end])
+        start = end
+        while start < len(text) and text[start] in '\n ':
+            start += 1
+    return chunks, start
+
+# Characters that are unsafe in attachment filenames or break attachment:// URLs, mapped to underscores in one pass
+_FILENAME_TRANS = str.maketrans(' /\\:?#%', '_______')
+
+def _safe_filename(s: str) -> str:
+    """Make user text safe to embed in an attachment filename"""
+    return s.translate(_FILENAME_TRANS)
+
+def _preview(s: str, n: int = 600) -> str:
+    """Truncate text to n characters with an ellipsis, slicing only when needed"""
+    return s if len(s) <= n else f"{s[:n]}..."
+
+class GenerationInterrupted(RuntimeError):
+    """A provider failed after part of a streamed response was already delivered"""
+
+class EmbedTemplate:
+    """Pre-built embed skeleton; build() fills {placeholders} in the title, description and field values"""
+    
+    def __init__(self, title, color, description="", fields=(), footer=None):
+        self._skeleton = {
+            "type": "rich",
+            "title": title,
+            "description": description,
+            "color": color,
+            "fields": [{"name": name, "value": value, "inline": False} for name, value in fields]
+        }
+        if footer:
+            self._skeleton["footer"] = {"text": footer}
+    
+    def build(self, **values) -> discord.Embed:
+        """Create a fresh embed from the skeleton with values substituted"""
+        data = dict(self._skeleton)
+        data["title"] = data["title"].format_map(values)
+        data["description"] = data["description"].format_map(values)
+        data["fields"] = [dict(field, value=field["value"].format_map(values)) for field in data["fields"]]
+        if "footer" in data:
+            data["footer"] = dict(data["footer"])
+        return discord.Embed.from_dict(data)
+
+# Minimum seconds between streamed preview edits (Discord allows ~5 message edits per 5s)
+STREAM_EDIT_INTERVAL = 1.0
+
+# Discord's hard limit on embed field values
+EMBED_FIELD_MAX = 1024
+
+# Maximum number of AI responses kept in the exact-match cache, and how long (seconds) each stays fresh
+RESPONSE_CACHE_MAX = 512
+RESPONSE_CACHE_TTL = 3600
+
+# Fresh exact-match responses are saved here periodically and on shutdown, and reloaded on startup
+RESPONSE_CACHE_FILE = '.response_cache.json'
+RESPONSE_CACHE_SAVE_INTERVAL = 300
+
+# Semantic caches are scoped (e.g. per /content type and topic words), so keep a bounded LRU of small caches
+SEMANTIC_CACHE_SCOPES_MAX = 256
+SEMANTIC_CACHE_SCOPE_ENTRIES = 32
+
+# Generated images are large, so keep only a few for repeat topics (same TTL as responses)
+IMAGE_CACHE_MAX = 32
+
+# Seconds between sweeps that drop rate-limit buckets which have refilled (a missing bucket counts as full)
+RATE_BUCKET_SWEEP_INTERVAL = 300
+
+# Skip a provider for CIRCUIT_BREAKER_COOLDOWN seconds after this many consecutive failures
+CIRCUIT_BREAKER_THRESHOLD = 3
+CIRCUIT_BREAKER_COOLDOWN = 60
+
+# Seconds setup_hook waits for provider warmups before logging in regardless
+WARMUP_TIMEOUT = 5
+
+# Hash of the last synced slash command tree; set FORCE_SYNC=1 to sync regardless
+TREE_HASH_FILE = '.tree_hash'
+
+# Gemini Batch Mode: seconds between job status polls, and the most topics per /content_batch
+BATCH_POLL_INTERVAL = 60
+BATCH_MAX_TOPICS = 20
+BATCH_DONE_STATES = {'JOB_STATE_SUCCEEDED', 'JOB_STATE_FAILED', 'JOB_STATE_CANCELLED', 'JOB_STATE_EXPIRED'}
+# Give up on a batch after this many consecutive failed status polls (e.g. the job was deleted)
+BATCH_MAX_POLL_ERRORS = 10
+
+# STAFFVIRTUAL-specific SEO keywords, matched case-insensitively in one scan
+SEO_INDUSTRY_KEYWORDS = (
+    'managed virtual teams', 'offshore CX pod', 'virtual staffing', 'remote team management',
+    'business process outsourcing', 'virtual assistants', 'remote work', 'distributed teams',
+    'enterprise outsourcing', 'virtual talent', 'managed services', 'business efficiency',
+    'scalable operations', 'cost optimization', 'team augmentation', 'offshore development',
+    'customer experience outsourcing', 'marketing operations', 'IT support services',
+    'creative operations', 'growth marketing', 'business automation'
+)
+_SEO_KEYWORD_LOOKUP = {keyword.lower(): keyword for keyword in SEO_INDUSTRY_KEYWORDS}
+# Lookahead capture so overlapping keywords are all reported; IGNORECASE avoids lowercasing the content
+_SEO_KEYWORD_RE = re.compile(
+    '(?=(' + '|'.join(re.escape(keyword) for keyword in _SEO_KEYWORD_LOOKUP) + '))', re.IGNORECASE
+)
+
+# Keyword matches for recent articles, keyed by a 16-byte content digest so the articles themselves aren't retained
+SEO_KEYWORD_CACHE_MAX = 256
+_seo_keyword_cache = OrderedDict()
+
+def _match_seo_keywords(content: str) -> tuple:
+    """Industry keywords found in content, in list order; cached since cache hits re-serve identical articles"""
+    key = hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+    found_keywords = _seo_keyword_cache.get(key)
+    if found_keywords is not None:
+        _seo_keyword_cache.move_to_end(key)
+        return found_keywords
+    
+    # One pass over the content finds every industry keyword
+    matched = {match.group(1).lower() for match in _SEO_KEYWORD_RE.finditer(content)}
+    found_keywords = tuple(_SEO_KEYWORD_LOOKUP[keyword] for keyword in _SEO_KEYWORD_LOOKUP if keyword in matched)[:15]  # Top 15
+    _seo_keyword_cache[key] = found_keywords
+    if len(_seo_keyword_cache) > SEO_KEYWORD_CACHE_MAX:
+        _seo_keyword_cache.popitem(last=False)
+    return found_keywords
+
+# Static guidelines appended to every branded prompt
+CONTENT_GUIDELINES = """
+        
+        Content Creation Guidelines:
+        1. Apply Modern Weave™ brand system and Filipino heritage positioning
+        2. Use institutional clarity with cultural warmth in tone
+        3. Lead with outcomes and specifics; quantify when possible
+        4. Emphasize managed delivery model vs marketplace approach
+        5. Position against commodity VA services with enterprise-grade governance
+        6. Include relevant proof points, SLAs, and accountability measures
+        7. For blog content, aim for 2000-3000 words with comprehensive coverage
+        8. Use sub-brand colors appropriately for different service verticals
+        9. Maintain Bain-grade restraint and executive-level professionalism
+        10. Always include clear, outcome-focused calls-to-action
+        
+        Create expert-level content that positions STAFFVIRTUAL as the premium enterprise choice.
+        """
+
+# Expert role for /content; a single shared object so the prompt prefix cache keys on it cheaply
+CONTENT_SYSTEM_CONTEXT = """
+        You are a senior content strategist and enterprise marketing expert for STAFFVIRTUAL.
+        
+        Expertise:
+        - B2B enterprise content marketing for virtual staffing industry
+        - Modern Weave™ brand system implementation
+        - Executive-level thought leadership content
+        - SEO optimization for enterprise keywords
+        - Competitive positioning against Belay, Time Etc, TaskUs
+        """
+
+# /content request body, filled with a single format_map pass per request
+CONTENT_PROMPT_TEMPLATE = """
+        Create comprehensive {content_type} for STAFFVIRTUAL about: {topic}
+        Target Keywords: {keywords}
+        
+        ENTERPRISE CONTENT REQUIREMENTS:
+        
+        1. COMPREHENSIVE LENGTH: 2500-4000 words for blog posts
+        2. EXECUTIVE POSITIONING: Target COOs, CTOs, CMOs, Heads of Operations
+        3. MODERN WEAVE™ BRAND INTEGRATION:
+           - Use institutional clarity with cultural warmth
+           - Reference Filipino craftsmanship and heritage
+           - Emphasize managed delivery vs marketplace approach
+           - Include enterprise governance and SLA focus
+        
+        4. ADVANCED SEO STRATEGY:
+           - Primary keyword in title, first 100 words, and conclusion
+           - Secondary keywords naturally integrated throughout
+           - Long-tail enterprise keywords (managed virtual teams, offshore CX pod)
+           - Meta title and description optimized for enterprise search intent
+           - Header structure optimized for featured snippets
+           - Internal linking opportunities to STAFFVIRTUAL service pages
+        
+        5. ENTERPRISE CONTENT STRUCTURE:
+           - Executive Summary (key outcomes and ROI upfront)
+           - Market Context and Industry Challenges
+           - Problem Analysis (enterprise pain points and constraints)
+           - STAFFVIRTUAL Solution Framework (capability towers, engagement models)
+           - Competitive Differentiation (vs Belay, Time Etc, TaskUs)
+           - Implementation Methodology (pod deployment, governance, SLAs)
+           - ROI Analysis and Business Case
+           - Case Study or Success Story (with metrics)
+           - Strategic Recommendations and Next Steps
+           - Executive Call-to-Action (pilot pod, SOW scoping, fit assessment)
+        
+        6. PROOF POINTS TO INCLUDE:
+           - Specific metrics and ROI data
+           - SLA attainment and quality scorecards
+           - Ramp timelines and time-to-productivity
+           - Security and compliance frameworks
+           - Team composition and governance structures
+        
+        Create authoritative, evidence-based content that positions STAFFVIRTUAL as the premium enterprise choice.
+        """
+
+# /content header image subject, filled with the topic
+CONTENT_IMAGE_PROMPT_TEMPLATE = "Modern Weave™ branded header image for STAFFVIRTUAL enterprise article about {topic}. Grid-driven layout, Filipino craftsmanship motifs, documentary-style photography. Professional, clean, enterprise-grade visual suitable for executive audiences."
+
+# Brand wrapper for every Nano Banana image request, filled with the subject prompt and style
+NANO_BANANA_IMAGE_TEMPLATE = """
+            Create a professional STAFFVIRTUAL image using Modern Weave™ brand system:
+            
+            Subject: {prompt}
+            Style: {style}, modern, clean, grid-driven aesthetic
+            Brand Colors: SV Blue (#1888FF), Authority Blue (#004B8D), Albatross White (#F8F8EB), Ink Black (#231F20)
+            Design System: Modern Weave™ - modular, grid-driven, rooted in Filipino craftsmanship
+            Photography Style: Bright, documentary-style, showing process and human infrastructure
+            Layout: Grid-first, ample whitespace, decisive hierarchy
+            Quality: Enterprise-grade, suitable for executive presentations and marketing
+            
+            Focus on visual elements that convey STAFFVIRTUAL's expertise in managed virtual teams.
+            Avoid text overlays, clutter, or gimmicks. Clean, professional, trustworthy aesthetic.
+            """
+
 # Bot configuration
 intents = discord.Intents.default()
 intents.message_content = True
@@ -58,32 +379,23 @@ class SVDiscordBot(commands.Bot):
         )
         
         # Brand configuration with Modern Weave™ system
-        def parse_color(color_str, default):
-            try:
-                if not color_str or color_str.strip() == '':
-                    return int(default.replace('#', ''), 16)
-                color_clean = color_str.replace('#', '').strip()
-                return int(color_clean, 16) if len(color_clean) == 6 else int(default.replace('#', ''), 16)
-            except (ValueError, AttributeError):
-                return int(default.replace('#', ''), 16)
-        
-        self.brand_config = {
-            'name': os.getenv('BRAND_NAME', 'STAFFVIRTUAL'),
-            'primary_color': parse_color(os.getenv('BRAND_PRIMARY_COLOR'), '#1888FF'),   # SV Core Blue
-            'secondary_color': parse_color(os.getenv('BRAND_SECONDARY_COLOR'), '#F8F8EB'), # Alabaster
-            'accent_color': parse_color(os.getenv('BRAND_ACCENT_COLOR'), '#004B8D'),     # Deep Blue
-            'neutral_color': parse_color(os.getenv('BRAND_NEUTRAL_COLOR'), '#231F20'),   # Ink Black
-            'sub_brand_colors': {
-                'Professional Services': '#004B8D',   # Authority, intellect
-                'Business Operations': '#DC2626',    # Urgency, output
-                'Creative Marketing': '#7C3AED',     # Creativity, imagination
-                'Technology & IT': '#059669',        # Innovation, agility
-                'Ecommerce & Retail': '#F97316',     # Commerce, demand
-                'Property & Real Estate': '#EAB308', # Stability, long-term value
-                'Travel & Health': '#6B7280',        # Neutral, calm
-                'Future/Experimental': '#231F20'     # Gravity, disruption
+        self.brand_config = BrandConfig(
+            name=_ENV.get('BRAND_NAME', 'STAFFVIRTUAL'),
+            primary_color=PRIMARY_COLOR,
+            secondary_color=SECONDARY_COLOR,
+            accent_color=ACCENT_COLOR,
+            neutral_color=NEUTRAL_COLOR,
+            sub_brand_colors={
+                'Professional Services': 0x004B8D,   # Authority, intellect
+                'Business Operations': 0xDC2626,    # Urgency, output
+                'Creative Marketing': 0x7C3AED,     # Creativity, imagination
+                'Technology & IT': 0x059669,        # Innovation, agility
+                'Ecommerce & Retail': 0xF97316,     # Commerce, demand
+                'Property & Real Estate': 0xEAB308, # Stability, long-term value
+                'Travel & Health': 0x6B7280,        # Neutral, calm
+                'Future/Experimental': 0x231F20     # Gravity, disruption
             },
-            'style_guidelines': (
+            style_guidelines=(
                 "Modern Weave™ identity system — modular, grid-driven, "
                 "rooted in Filipino craftsmanship yet scaled for global enterprise. "
                 "Layouts follow disciplined grid logic (12-column responsive / 10x6 slide grids). "
@@ -92,7 +404,7 @@ class SVDiscordBot(commands.Bot):
                 "Typography pairs Gambetta (serif authority) with General Sans (clarity, UI, body). "
                 "All assets engineered for clarity, trust, and impact."
             ),
-            'voice_tone': (
+            voice_tone=(
                 "Institutional clarity with cultural warmth. "
                 "Calm, precise, and executive in client decks. "
                 "Data-driven and minimal in case studies. "
@@ -100,149 +412,139 @@ class SVDiscordBot(commands.Bot):
                 "Never promotional hype — always outcome-first, evidence-backed, "
                 "and reflective of Filipino respect and craftsmanship."
             ),
-            'brandline': "Carefully Woven, Built to Scale. Outsourced. Engineered. Embedded.",
-            'core_beliefs': [
+            brandline="Carefully Woven, Built to Scale. Outsourced. Engineered. Embedded.",
+            core_beliefs=(
                 "Craftsmanship Over Commodity",
                 "People First, Always",
                 "Trust is Engineered",
                 "Heritage is a Strength",
                 "Design is a System"
-            ],
-            'typography': {
+            ),
+            typography={
                 'primary_serif': 'Gambetta',          # Authority, heritage
                 'supporting_sans': 'General Sans',    # Structure, clarity
                 'accent_italic': 'General Sans Italic' # Direction, innovation
             }
-        }
+        )
+        
+        # Enhanced brand DNA with enterprise positioning, and the provider system prompts built from it
+        self.brand_dna = load_brand_dna()
+        self._brand_system_message = {"role": "system", "content": self.brand_dna}
+        self._genai_configs = {}  # max_tokens -> GenerateContentConfig
         
+        self._http = None  # shared HTTP connection pool, created with the OpenAI client
         self.ai_clients = self._initialize_ai_clients()
+        # The configured providers never change after startup
+        self._has_nano_banana = 'nano_banana' in self.ai_clients
+        self._has_openai = 'openai' in self.ai_clients
+        self._text_providers = tuple(name for name in ('nano_banana', 'gemini', 'openai') if name in self.ai_clients)
         self.knowledge_manager = KnowledgeManager()
         
-        # Enhanced brand DNA with enterprise positioning
-        self.brand_dna = """
-        STAFFVIRTUAL — Enterprise Virtual Talent Partner
-        
-        Company Profile:
-        - Mission: Enable growing companies to scale with precision by deploying vetted, managed virtual teams that deliver measurable outcomes.
-        - Vision: Become the most trusted global partner for building modern, distributed operating capacity.
-        - Ideal Customers (ICP): Mid-market to enterprise operators (COO, CIO/CTO, CMO, Heads of Ops/Customer/IT) in SaaS, Fintech, E-commerce, Professional Services, Healthcare, Legal, and B2B Services.
-        - Market Focus: North America, UK/Europe, and ANZ with delivery in the Philippines and follow-the-sun coverage.
-        
-        Category Narrative:
-        - The Modern Weave™: We connect specialist talent, refined process, and lightweight tech to create an adaptive operating fabric—scalable, secure, and always on.
-        
-        Service Portfolio (Capability Towers):
-        1) CX & Operations
-           - Virtual Assistants, CX Pods (Voice/Chat/Email), Billing/AR, Back-Office Ops, Data QA, Research
-        2) Creative & Content Studio
-           - Brand & Design Ops, Marketing Design, Motion/Video Editing, Content Production, Social Ops
-        3) Technology & Engineering
-           - Web/App Dev, QA, DevOps, Data Engineering, IT Helpdesk (L1–L2), NOC, Cloud Support
-        4) Growth Marketing
-           - SEO, Paid Media (PPC/Meta/LinkedIn), Marketing Analytics, Email/Lifecycle, CRO, Marketing Ops
-        
-        Engagement Models & Commercials:
-        - Dedicated Talent (FTE or Pod): Embedded specialists with shared QA and Team Lead oversight.
-        - Managed Outcomes (SOW): Defined deliverables, SLAs, and governance.
-        - Project Squads: Time-boxed initiatives with cross-functional roles.
-        - Pricing: Transparent and role-based with seniority bands (L1–L3). Hourly, monthly retainers, or SOW.
-          Reference ranges: $15–$75/hr; $2K–$15K/mo retainers; SOW on scope.
-        
-        Operating Model:
-        - Vetted Talent Bench: Multi-step assessment, domain screening, and live work simulations.
-        - Governance: Dedicated Team Leads, QA scorecards, weekly business reviews, and quarterly exec reviews.
-        - Tooling: We integrate with your stack (Google/Microsoft, Slack/Teams, Jira/Asana, HubSpot/SFDC).
-        - Coverage: 24/5 to 24/7 options with redundancy and documented runbooks.
-        
-        Competitive Positioning:
-        - Premium Alternative to freelance networks and basic VA shops (Belay, Time Etc, Fancy Hands).
-        - Vertical & Role Depth: Structured playbooks for CX, TechOps, Creative Ops, and Growth.
-        - Managed, Not Marketplace: Accountability via SLAs, QA, and leadership layers.
-        - Flexible & Low-Friction: Start lean, scale fast, adjust roles without re-hiring cycles.
-        
-        Trust, Security & Compliance:
-        - Data Protection: Principle of least privilege, password vaulting, and secure device policies.
-        - Process Controls: Role-based access, audit trails, and incident response playbooks.
-        - Legal: DPAs available; client-preferred NDAs and addenda supported.
-        - Compliance-Ready: We align to enterprise expectations; certification details provided during onboarding.
-        
-        Brand Identity (Essentials for Content & Design):
-        - Palette: Trust Blue (#1888FF), Authority Blue (#004B8D), Clean White (#F8F8EB), Ink Black (#231F20)
-        - Motifs: Modern Weave grid, rounded tiles, light node connections; clean, editorial compositions.
-        - Photography: Realistic, bright, minimal; no text overlays; avoid clutter and gimmicks.
-        - Illustration/3D: Isometric/editorial accents only; clean lighting; no cropped or cut-off elements.
-        - Layout: Grid-first, ample whitespace, decisive hierarchy; Bain-grade restraint.
-        - Tone of Voice: Executive, measured, evidence-led, outcome-oriented. Avoid hype and slang.
-        
-        Voice & Messaging Rules:
-        - Lead with outcomes and specifics; quantify when possible.
-        - Use plain English. Prefer verbs over adjectives. Keep sentences tight.
-        - Emphasize accountability (SLAs, QA, governance) and adaptability (scale up/down, swap roles).
-        - Do say: "We'll stand up a two-role pod with a 14-day ramp and weekly quality reviews."
-          Don't say: "We'll supercharge your growth with world-class ninjas."
-        
-        Key Messages:
-        - "Build capacity without adding headcount."
-        - "Managed virtual teams that hit SLAs—and your goals."
-        - "Scale securely. Deliver faster. Reduce operational drag."
-        - "Outcomes over overhead."
-        
-        Contact CTA Library:
-        - "Request a pilot pod"
-        - "Scope an SOW"
-        - "See a role matrix and pricing bands"
-        - "Book a 20-minute fit assessment"
-        """
+        # In-flight work keyed by request key, shared by identical concurrent callers: image tasks from
+        # _single_flight, and futures for the final text of streams in progress (see _stream_ai_response)
+        self._inflight = {}
+        
+        # Exact-match LRU cache of (stored_at wall-clock time, compressed response) keyed by _request_key
+        self._response_cache = self._load_response_cache()
+        self.cache_stats = {"hits": 0, "misses": 0, "semantic_hits": 0}
+        
+        # LRU of (stored_at, successful image result) keyed by _request_key('image', prompt, style)
+        self._image_cache = OrderedDict()
+        
+        # Expert role prompt prefixes, keyed by system_context
+        self._prompt_prefixes = {}
+        
+        # Per-provider circuit breaker state: name -> (consecutive failures, open until)
+        self._provider_health = {}
+        
+        # Token buckets for rate-limited commands: (user_id, command) -> (tokens, last refill, full again at)
+        self._rate_buckets = {}
+        self._rate_buckets_swept = time.monotonic()
+        
+        # Background tasks waiting on Gemini batch jobs (strong references so they are not collected)
+        self._batch_tasks = set()
+        
+        # Background task that periodically saves the response cache (started in setup_hook)
+        self._cache_save_task = None
+        # Whether the response cache changed since the last save, and the disk write currently running in a thread
+        self._response_cache_dirty = False
+        self._cache_write = None
+        
+        # LRU of semantic caches for near-duplicate requests, one per (system_context, scope)
+        self._semantic_caches = OrderedDict()
+    
+    def reload_brand_dna(self):
+        """Re-read the brand DNA file and drop everything generated or built from the old one"""
+        self.brand_dna = load_brand_dna()
+        self._brand_system_message = {"role": "system", "content": self.brand_dna}
+        self._genai_configs.clear()
+        self._response_cache.clear()
+        self._response_cache_dirty = True
+        self._semantic_caches.clear()
+        if 'gemini' in self.ai_clients:
+            self.ai_clients['gemini'] = _get_legacy_genai().GenerativeModel('gemini-1.5-flash', system_instruction=self.brand_dna)
+        logger.info("Brand DNA reloaded (%s chars)", len(self.brand_dna))
     
     def _initialize_ai_clients(self):
         """Initialize AI clients with Nano Banana support"""
         clients = {}
-        gemini_key = os.getenv('GEMINI_API_KEY')
+        gemini_key = _ENV.get('GEMINI_API_KEY')
         
-        if gemini_key and genai:
+        if gemini_key:
             try:
-                if NANO_BANANA_AVAILABLE and types:
-                    clients['nano_banana'] = genai.Client(api_key=gemini_key)
+                if nano_banana_available():
+                    clients['nano_banana'] = _get_genai().Client(api_key=gemini_key)
                     logger.info("Nano Banana client initialized!")
-                else:
-                    genai.configure(api_key=gemini_key)
-                    clients['gemini'] = genai.GenerativeModel('gemini-1.5-flash')
+                elif _get_legacy_genai():
+                    legacy_genai = _get_legacy_genai()
+                    legacy_genai.configure(api_key=gemini_key)
+                    clients['gemini'] = legacy_genai.GenerativeModel('gemini-1.5-flash', system_instruction=self.brand_dna)
                     logger.info("Gemini client initialized")
             except Exception as e:
-                logger.error(f"Gemini init error: {e}")
+                logger.error("Gemini init error: %s", e)
         
-        openai_key = os.getenv('OPENAI_API_KEY')
-        if openai_key and openai:
+        openai_key = _ENV.get('OPENAI_API_KEY')
+        openai = _get_openai() if openai_key else None
+        if openai:
             try:
-                clients['openai'] = openai.OpenAI(api_key=openai_key)
+                # One long-lived pooled HTTP client, tuned for concurrent commands (httpx ships with the SDK)
+                import httpx
+                self._http = httpx.AsyncClient(
+                    timeout=httpx.Timeout(60.0, connect=10.0),
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+                )
+                clients['openai'] = openai.AsyncOpenAI(api_key=openai_key, http_client=self._http)
                 logger.info("OpenAI client initialized")
             except Exception as e:
-                logger.error(f"OpenAI init error: {e}")
+                logger.error("OpenAI init error: %s", e)
         
         return clients
     
-    async def _generate_nano_banana_image(self, prompt: str, style: str = "professional"):
-        """Generate images using Nano Banana with Modern Weave™ branding"""
+    async def _generate_nano_banana_image(self, prompt: str, style: str = "professional", use_cache: bool = True):
+        """Generate images using Nano Banana with Modern Weave™ branding, reusing recent and in-flight results"""
+        if not self._has_nano_banana:
+            return {"success": False, "error": "Nano Banana not available"}
+        key = _request_key('image', prompt, style)
+        # With use_cache=False skip recent results; the fresh image still replaces the cached one
+        entry = self._image_cache.get(key) if use_cache else None
+        if entry is not None and time.monotonic() - entry[0] <= RESPONSE_CACHE_TTL:
+            self._image_cache.move_to_end(key)
+            return entry[1]
+        
+        result = await self._single_flight(key, lambda: self._request_nano_banana_image(prompt, style))
+        if result.get('success'):
+            self._image_cache[key] = (time.monotonic(), result)
+            self._image_cache.move_to_end(key)
+            if len(self._image_cache) > IMAGE_CACHE_MAX:
+                self._image_cache.popitem(last=False)
+        return result
+    
+    async def _request_nano_banana_image(self, prompt: str, style: str):
+        """Call the Nano Banana image model once"""
         try:
-            if 'nano_banana' not in self.ai_clients:
-                return {"success": False, "error": "Nano Banana not available"}
-            
-            branded_prompt = f"""
-            Create a professional STAFFVIRTUAL image using Modern Weave™ brand system:
-            
-            Subject: {prompt}
-            Style: {style}, modern, clean, grid-driven aesthetic
-            Brand Colors: SV Blue (#1888FF), Authority Blue (#004B8D), Albatross White (#F8F8EB), Ink Black (#231F20)
-            Design System: Modern Weave™ - modular, grid-driven, rooted in Filipino craftsmanship
-            Photography Style: Bright, documentary-style, showing process and human infrastructure
-            Layout: Grid-first, ample whitespace, decisive hierarchy
-            Quality: Enterprise-grade, suitable for executive presentations and marketing
-            
-            Focus on visual elements that convey STAFFVIRTUAL's expertise in managed virtual teams.
-            Avoid text overlays, clutter, or gimmicks. Clean, professional, trustworthy aesthetic.
-            """
+            branded_prompt = NANO_BANANA_IMAGE_TEMPLATE.format_map({'prompt': prompt, 'style': style})
             
-            response = self.ai_clients['nano_banana'].models.generate_content(
+            response = await self.ai_clients['nano_banana'].aio.models.generate_content(
                 model="gemini-2.5-flash-image-preview",
                 contents=[branded_prompt]
             )
@@ -251,17 +553,17 @@ class SVDiscordBot(commands.Bot):
                 if hasattr(part, 'inline_data') and part.inline_data is not None:
                     image_data = part.inline_data.data
                     
-                    if Image:
-                        image = Image.open(io.BytesIO(image_data))
-                        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.png')
-                        image.save(temp_file.name, 'PNG')
-                        
-                        return {
-                            "success": True,
-                            "image_path": temp_file.name,
-                            "description": "STAFFVIRTUAL Modern Weave™ branded image generated",
-                            "model": "gemini-2.5-flash-image-preview"
-                        }
+                    # PNG payloads upload straight from memory; convert anything else off the event loop.
+                    # Sniff the signature rather than trusting mime_type, which is not always set
+                    if not image_data.startswith(PNG_SIGNATURE) and _get_pil():
+                        image_data = await asyncio.to_thread(_encode_png, image_data)
+                    
+                    return {
+                        "success": True,
+                        "image_bytes": image_data,
+                        "description": "STAFFVIRTUAL Modern Weave™ branded image generated",
+                        "model": "gemini-2.5-flash-image-preview"
+                    }
             
             return {"success": False, "error": "No image data received"}
         except Exception as e:
@@ -269,220 +571,575 @@ class SVDiscordBot(commands.Bot):
     
     async def _extract_seo_keywords(self, content: str):
         """Extract and analyze SEO keywords from content"""
+        return list(_match_seo_keywords(content))
+    
+    def _build_prompt(self, prompt, system_context=""):
+        """Wrap a user request with the expert role and content guidelines"""
+        # Brand DNA goes in the provider system prompt (see _genai_config / _openai_messages)
+        # so the identical prefix is cached provider-side instead of billed per request
+        prefix = self._prompt_prefixes.get(system_context)
+        if prefix is None:
+            prefix = self._prompt_prefixes[system_context] = f"""
+        Your Expert Role: {system_context}
+        
+        User Request: """
+        return prefix + prompt + CONTENT_GUIDELINES
+    
+    def _single_flight(self, key, factory):
+        """Await the in-flight call for key, starting factory() only if no identical call is running"""
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller cancelling does not cancel the call for the others
+        return asyncio.shield(task)
+    
+    def _get_cached_response(self, key):
+        """Return a cached AI response and mark it most recently used, or None on a miss"""
+        entry = self._response_cache.get(key)
+        if entry is not None and time.time() - entry[0] > RESPONSE_CACHE_TTL:
+            del self._response_cache[key]
+            entry = None
+        if entry is None:
+            self.cache_stats['misses'] += 1
+            return None
+        blob = entry[1]
+        self._response_cache.move_to_end(key)
+        self.cache_stats['hits'] += 1
+        return decompress_text(blob)
+    
+    def _store_response(self, key, result):
+        """Cache a successful AI response, evicting the least recently used entry when full"""
+        if not result or result.startswith("❌"):
+            return
+        self._response_cache[key] = (time.time(), compress_text(result))
+        self._response_cache_dirty = True
+        self._response_cache.move_to_end(key)
+        if len(self._response_cache) > RESPONSE_CACHE_MAX:
+            self._response_cache.popitem(last=False)
+    
+    def _load_response_cache(self):
+        """Restore the still-fresh exact-match responses saved by the previous run"""
+        cache = OrderedDict()
         try:
-            # Enhanced keyword extraction for virtual staffing
-            words = re.findall(r'\b[a-zA-Z]{3,}\b', content.lower())
-            
-            # STAFFVIRTUAL-specific keywords
-            industry_keywords = [
-                'managed virtual teams', 'offshore CX pod', 'virtual staffing', 'remote team management',
-                'business process outsourcing', 'virtual assistants', 'remote work', 'distributed teams',
-                'enterprise outsourcing', 'virtual talent', 'managed services', 'business efficiency',
-                'scalable operations', 'cost optimization', 'team augmentation', 'offshore development',
-                'customer experience outsourcing', 'marketing operations', 'IT support services',
-                'creative operations', 'growth marketing', 'business automation'
+            with open(RESPONSE_CACHE_FILE, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return cache
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load response cache: %s", e)
+            return cache
+        # Responses generated under a different brand DNA are stale
+        if not isinstance(saved, dict) or saved.get('brand') != _request_key(self.brand_dna):
+            return cache
+        entries = saved.get('entries')
+        if not isinstance(entries, list):
+            return cache
+        cutoff = time.time() - RESPONSE_CACHE_TTL
+        # Saved least recently used first, so insertion order restores the LRU order
+        for entry in entries[-RESPONSE_CACHE_MAX:]:
+            try:
+                key, stored_at, text = entry
+                if stored_at >= cutoff:
+                    cache[key] = (stored_at, compress_text(text))
+            except (TypeError, ValueError, AttributeError):
+                continue  # Skip malformed entries rather than refusing to start
+        logger.info("Restored %s cached responses", len(cache))
+        return cache
+    
+    @staticmethod
+    def _write_response_cache(snapshot, brand) -> bool:
+        """Atomically write a cache snapshot as plain text, independent of the compression codec (runs in a thread)"""
+        cutoff = time.time() - RESPONSE_CACHE_TTL
+        try:
+            entries = [
+                (key, stored_at, decompress_text(blob))
+                for key, (stored_at, blob) in snapshot
+                if stored_at >= cutoff
             ]
-            
-            found_keywords = []
-            for keyword in industry_keywords:
-                if keyword.replace(' ', '') in ' '.join(words) or keyword in content.lower():
-                    found_keywords.append(keyword)
-            
-            return found_keywords[:15]  # Return top 15
-        except:
-            return ['managed virtual teams', 'virtual staffing', 'business efficiency']
+            temp_file = f"{RESPONSE_CACHE_FILE}.tmp"
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump({'brand': brand, 'entries': entries}, f, ensure_ascii=False)
+            os.replace(temp_file, RESPONSE_CACHE_FILE)
+            return True
+        except Exception as e:
+            logger.warning("Could not save response cache: %s", e)
+            return False
     
-    async def _get_ai_response(self, prompt, system_context="", use_knowledge=True, max_length=None):
-        """Get AI response with enhanced Modern Weave™ brand context"""
+    async def _save_response_cache(self):
+        """Write the response cache to disk off the loop if it changed, one write at a time"""
+        # A write can outlive a cancelled caller in its thread; never start another on the same temp file meanwhile
+        while self._cache_write is not None and not self._cache_write.done():
+            await asyncio.wait({self._cache_write})
+        if not self._response_cache_dirty:
+            return
+        self._response_cache_dirty = False
+        snapshot = list(self._response_cache.items())
+        self._cache_write = asyncio.ensure_future(
+            asyncio.to_thread(self._write_response_cache, snapshot, _request_key(self.brand_dna))
+        )
+        if not await asyncio.shield(self._cache_write):
+            self._response_cache_dirty = True
+    
+    async def _save_response_cache_periodically(self):
+        """Save the response cache every RESPONSE_CACHE_SAVE_INTERVAL seconds so an abrupt kill loses little"""
+        while True:
+            await asyncio.sleep(RESPONSE_CACHE_SAVE_INTERVAL)
+            await self._save_response_cache()
+    
+    async def _embed_text(self, text):
+        """Embed text with the first available provider, or None if embeddings are unavailable"""
         try:
-            enhanced_prompt = f"""
-            {self.brand_dna}
-            
-            Your Expert Role: {system_context}
-            
-            User Request: {prompt}
-            
-            Content Creation Guidelines:
-            1. Apply Modern Weave™ brand system and Filipino heritage positioning
-            2. Use institutional clarity with cultural warmth in tone
-            3. Lead with outcomes and specifics; quantify when possible
-            4. Emphasize managed delivery model vs marketplace approach
-            5. Position against commodity VA services with enterprise-grade governance
-            6. Include relevant proof points, SLAs, and accountability measures
-            7. For blog content, aim for 2000-3000 words with comprehensive coverage
-            8. Use sub-brand colors appropriately for different service verticals
-            9. Maintain Bain-grade restraint and executive-level professionalism
-            10. Always include clear, outcome-focused calls-to-action
-            
-            Create expert-level content that positions STAFFVIRTUAL as the premium enterprise choice.
-            """
-            
-            # Try Nano Banana first
-            if 'nano_banana' in self.ai_clients:
-                try:
-                    response = self.ai_clients['nano_banana'].models.generate_content(
-                        model="gemini-2.0-flash-exp",
-                        contents=[enhanced_prompt]
-                    )
-                    result = response.candidates[0].content.parts[0].text
-                    return result[:max_length] + "..." if max_length and len(result) > max_length else result
-                except Exception as e:
-                    logger.error(f"Nano Banana text error: {e}")
-            
-            # Try legacy Gemini
-            if 'gemini' in self.ai_clients:
+            if self._has_nano_banana:
+                response = await self.ai_clients['nano_banana'].aio.models.embed_content(
+                    model="text-embedding-004",
+                    contents=text
+                )
+                return response.embeddings[0].values
+            if self._has_openai:
+                response = await self.ai_clients['openai'].embeddings.create(
+                    model="text-embedding-3-small",
+                    input=text
+                )
+                return response.data[0].embedding
+        except Exception as e:
+            logger.error("Embedding error: %s", e)
+        return None
+    
+    async def _semantic_lookup(self, system_context, semantic_key, semantic_scope=None):
+        """Return (embedding, cached response) for a near-duplicate request, either may be None"""
+        if not semantic_key or not SEMANTIC_CACHE_AVAILABLE:
+            return None, None
+        # Only requests with the same scope (e.g. content type and topic words) may share responses
+        namespace = _request_key(system_context, semantic_scope)
+        cache = self._semantic_caches.get(namespace)
+        if cache is None:
+            # Nothing to match against, so skip the embedding round trip; callers embed later for storing
+            return None, None
+        vector = await self._embed_text(semantic_key)
+        if vector is None:
+            return None, None
+        result = cache.lookup(vector)
+        if len(cache):
+            self._semantic_caches.move_to_end(namespace)
+        else:
+            # Every entry expired; free the scope
+            del self._semantic_caches[namespace]
+        if result is not None:
+            self.cache_stats['semantic_hits'] += 1
+        return vector, result
+    
+    def _semantic_store(self, system_context, vector, result, semantic_scope=None):
+        """Remember a successful response under its semantic key embedding"""
+        if vector is None or not result or result.startswith("❌"):
+            return
+        namespace = _request_key(system_context, semantic_scope)
+        cache = self._semantic_caches.get(namespace)
+        if cache is None:
+            cache = self._semantic_caches[namespace] = SemanticCache(max_entries=SEMANTIC_CACHE_SCOPE_ENTRIES)
+        cache.add(vector, result)
+        self._semantic_caches.move_to_end(namespace)
+        if len(self._semantic_caches) > SEMANTIC_CACHE_SCOPES_MAX:
+            self._semantic_caches.popitem(last=False)
+    
+    def _genai_config(self, max_tokens=None):
+        """Gemini request config carrying the brand DNA as the system instruction"""
+        config = self._genai_configs.get(max_tokens)
+        if config is None:
+            config = self._genai_configs[max_tokens] = _get_genai_types().GenerateContentConfig(
+                system_instruction=self.brand_dna, max_output_tokens=max_tokens
+            )
+        return config
+    
+    def _openai_messages(self, prompt, system_context=""):
+        """Chat messages with the brand DNA as a stable leading system message"""
+        # Keep the brand DNA message byte-identical across requests so OpenAI's prompt cache can reuse it
+        messages = [self._brand_system_message]
+        if system_context:
+            messages.append({"role": "system", "content": system_context})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+    
+    async def _call_gemini(self, enhanced_prompt):
+        """Generate text with the legacy google-generativeai client"""
+        response = await self.ai_clients['gemini'].generate_content_async(enhanced_prompt)
+        return response.text
+    
+    def _take_rate_limit_token(self, key, capacity, refill_per_sec):
+        """Take one token from a bucket; return 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        if now - self._rate_buckets_swept >= RATE_BUCKET_SWEEP_INTERVAL:
+            self._rate_buckets_swept = now
+            self._rate_buckets = {k: bucket for k, bucket in self._rate_buckets.items() if bucket[2] > now}
+        
+        tokens, last_refill, _ = self._rate_buckets.get(key, (capacity, now, now))
+        tokens = min(capacity, tokens + (now - last_refill) * refill_per_sec)
+        wait = (1 - tokens) / refill_per_sec if tokens < 1 else 0
+        if not wait:
+            tokens -= 1
+        self._rate_buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_sec)
+        return wait
+    
+    def _provider_available(self, name):
+        """Check whether a provider's circuit breaker is closed"""
+        failures, open_until = self._provider_health.get(name, (0, 0.0))
+        return failures < CIRCUIT_BREAKER_THRESHOLD or time.monotonic() >= open_until
+    
+    def _record_provider_result(self, name, success):
+        """Reset a provider's failure count on success, or open its breaker after repeated failures"""
+        if success:
+            self._provider_health.pop(name, None)
+            return
+        failures = self._provider_health.get(name, (0, 0.0))[0] + 1
+        open_until = time.monotonic() + CIRCUIT_BREAKER_COOLDOWN if failures >= CIRCUIT_BREAKER_THRESHOLD else 0.0
+        self._provider_health[name] = (failures, open_until)
+        if open_until:
+            logger.warning("%s failed %s times, skipping for %ss", name, failures, CIRCUIT_BREAKER_COOLDOWN)
+    
+    async def _stream_ai_response(self, prompt, system_context="", semantic_key=None, use_cache=True, semantic_scope=None):
+        """Stream an AI response as text deltas, falling back through providers only before the first token"""
+        key = _request_key(prompt, system_context, None)
+        vector = cached = None
+        if use_cache:
+            cached = self._get_cached_response(key)
+            if cached is None:
+                vector, cached = await self._semantic_lookup(system_context, semantic_key, semantic_scope)
+        if cached is not None:
+            yield cached
+            return
+        
+        # An identical request is already streaming: share its final text rather than paying for a second generation
+        leader = self._inflight.get(key)
+        if leader is not None:
+            yield await asyncio.shield(leader)
+            return
+        shared = asyncio.get_running_loop().create_future()
+        self._inflight[key] = shared
+        result = None
+        
+        # No scoped semantic cache yet means no embedding was needed for the lookup; embed alongside generation for storing
+        embed_task = None
+        if use_cache and vector is None and semantic_key and SEMANTIC_CACHE_AVAILABLE:
+            embed_task = asyncio.ensure_future(self._embed_text(semantic_key))
+        try:
+            # Stream from healthy providers in priority order; if every breaker is open, try them all
+            healthy = [name for name in self._text_providers if self._provider_available(name)] or list(self._text_providers)
+            streams = {
+                'nano_banana': lambda: self._stream_nano_banana(self._build_prompt(prompt, system_context)),
+                'openai': lambda: self._stream_openai(prompt, system_context),
+            }
+            for name in healthy:
+                if name not in streams:
+                    continue
+                chunks = []
                 try:
-                    response = self.ai_clients['gemini'].generate_content(enhanced_prompt)
-                    result = response.text
-                    return result[:max_length] + "..." if max_length and len(result) > max_length else result
+                    async for delta in streams[name]():
+                        chunks.append(delta)
+                        yield delta
                 except Exception as e:
-                    logger.error(f"Gemini error: {e}")
+                    self._record_provider_result(name, False)
+                    logger.error("%s stream error: %s", name, e)
+                    if chunks:
+                        # Text was already yielded, so falling back would splice two articles together
+                        raise GenerationInterrupted(
+                            f"Generation interrupted after {sum(map(len, chunks))} characters ({name} error: {e}). Please run the command again."
+                        ) from e
+                    continue
+                if not chunks:
+                    # A blocked or empty response yields no text; treat it as a failure and try the next provider
+                    self._record_provider_result(name, False)
+                    logger.error("%s stream returned no text", name)
+                    continue
+                self._record_provider_result(name, True)
+                result = "".join(chunks)
+                await self._remember_response(key, result, system_context, semantic_scope, vector, embed_task)
+                return
             
-            # Try OpenAI
-            if 'openai' in self.ai_clients:
+            # Legacy Gemini has no async stream; it delivers the full response in one piece
+            fallback = None
+            if 'gemini' in healthy:
                 try:
-                    response = self.ai_clients['openai'].chat.completions.create(
-                        model="gpt-4",
-                        messages=[
-                            {"role": "system", "content": self.brand_dna + "\n" + system_context},
-                            {"role": "user", "content": prompt}
-                        ],
-                        max_tokens=4000  # Increased for longer content
-                    )
-                    result = response.choices[0].message.content
-                    return result[:max_length] + "..." if max_length and len(result) > max_length else result
+                    fallback = await self._call_gemini(self._build_prompt(prompt, system_context))
                 except Exception as e:
-                    logger.error(f"OpenAI error: {e}")
-            
-            return "❌ No AI service available."
-        except Exception as e:
-            return f"❌ Error: {str(e)}"
+                    logger.error("gemini text error: %s", e)
+                self._record_provider_result('gemini', bool(fallback))
+            if not fallback:
+                result = "❌ No AI service available."
+                yield result
+                return
+            await self._remember_response(key, fallback, system_context, semantic_scope, vector, embed_task)
+            result = fallback
+            yield result
+        finally:
+            if embed_task is not None:
+                embed_task.cancel()
+            if self._inflight.get(key) is shared:
+                del self._inflight[key]
+            if result is not None:
+                shared.set_result(result)
+            else:
+                shared.set_exception(GenerationInterrupted("The identical request this one was waiting on failed. Please run the command again."))
+                shared.exception()  # Mark retrieved so a failure without waiters is not logged as unhandled
+    
+    async def _remember_response(self, key, result, system_context, semantic_scope, vector, embed_task):
+        """Cache a fresh streamed response, using the embedding computed alongside generation if needed"""
+        self._store_response(key, result)
+        if vector is None and embed_task is not None:
+            vector = await embed_task
+        self._semantic_store(system_context, vector, result, semantic_scope)
+    
+    async def _stream_nano_banana(self, enhanced_prompt):
+        """Stream text deltas from the Nano Banana (google-genai) client"""
+        stream = await self.ai_clients['nano_banana'].aio.models.generate_content_stream(
+            model="gemini-2.0-flash-exp",
+            contents=[enhanced_prompt],
+            config=self._genai_config()
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+    
+    async def _stream_openai(self, prompt, system_context=""):
+        """Stream text deltas from OpenAI, passing brand context as the system message"""
+        stream = await self.ai_clients['openai'].chat.completions.create(
+            model="gpt-4",
+            messages=self._openai_messages(prompt, system_context),
+            max_tokens=4000,
+            stream=True
+        )
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                yield delta
     
     def _add_to_knowledge_base(self, title: str, content: str):
-        """Add to knowledge base"""
+        """Add a manual entry to the persistent knowledge base"""
         try:
-            if not hasattr(self, 'knowledge_base'):
-                self.knowledge_base = {"manual_entries": {}, "scraped_content": {}}
-            self.knowledge_base["manual_entries"][title] = {"content": content, "type": "manual"}
-            return True
-        except:
+            return self.knowledge_manager.add_manual_entry(title, content)
+        except (KeyError, AttributeError, TypeError) as e:
+            logger.error("Knowledge base add error: %s", e)
             return False
         
     async def setup_hook(self):
         logger.info("Setting up STAFFVIRTUAL Enterprise Marketing Suite...")
         try:
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} enterprise agents")
+            tree_hash = self._command_tree_hash()
+            if not _ENV.get('FORCE_SYNC') and self._read_tree_hash() == tree_hash:
+                logger.info("Command tree unchanged, skipping sync")
+            else:
+                synced = await self.tree.sync()
+                self._write_tree_hash(tree_hash)
+                logger.info("Synced %s enterprise agents", len(synced))
+        except Exception as e:
+            logger.error("Sync error: %s", e)
+        
+        # Prime provider connections so the first command skips the TLS handshake; a slow provider must not delay login
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(self._warmup_gemini(), self._warmup_openai(), return_exceptions=True), WARMUP_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Provider warmup exceeded %ss, continuing startup", WARMUP_TIMEOUT)
+        
+        self._cache_save_task = asyncio.ensure_future(self._save_response_cache_periodically())
+        # Container platforms stop the bot with SIGTERM, which discord.py does not handle; shut down cleanly instead
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(self.close()))
+        except (NotImplementedError, RuntimeError):
+            pass  # Not supported on Windows
+    
+    def _command_tree_hash(self):
+        """Hash the local slash command definitions to detect changes between boots"""
+        spec = [
+            (command.name, command.description,
+             [(param.name, param.description, param.type.value, param.required,
+               [(choice.name, choice.value) for choice in param.choices])
+              for param in getattr(command, 'parameters', [])])
+            for command in self.tree.get_commands()
+        ]
+        return hashlib.sha256(json.dumps(spec).encode('utf-8')).hexdigest()
+    
+    def _read_tree_hash(self):
+        """Read the command tree hash from the last successful sync"""
+        try:
+            with open(TREE_HASH_FILE, 'r', encoding='utf-8') as f:
+                return f.read().strip()
+        except OSError:
+            return None
+    
+    def _write_tree_hash(self, tree_hash):
+        """Persist the command tree hash after a successful sync"""
+        try:
+            with open(TREE_HASH_FILE, 'w', encoding='utf-8') as f:
+                f.write(tree_hash)
+        except OSError as e:
+            logger.warning("Could not save command tree hash: %s", e)
+    
+    async def _submit_batch(self, prompts, system_context="", display_name=None):
+        """Queue prompts as one Gemini Batch Mode job (half price, completes asynchronously) and return its name"""
+        types = _get_genai_types()
+        requests = [
+            types.InlinedRequest(contents=self._build_prompt(prompt, system_context), config=self._genai_config())
+            for prompt in prompts
+        ]
+        job = await self.ai_clients['nano_banana'].aio.batches.create(
+            model="gemini-2.5-flash",
+            src=requests,
+            config={'display_name': display_name} if display_name else None
+        )
+        logger.info("Queued batch %s with %s requests", job.name, len(requests))
+        return job.name
+    
+    async def _wait_for_batch(self, name):
+        """Poll a batch job until it reaches a final state and return the job; raise after repeated poll errors"""
+        errors = 0
+        while True:
+            await asyncio.sleep(BATCH_POLL_INTERVAL)
+            try:
+                job = await self.ai_clients['nano_banana'].aio.batches.get(name=name)
+            except Exception as e:
+                errors += 1
+                logger.warning("Batch %s poll error (%s/%s): %s", name, errors, BATCH_MAX_POLL_ERRORS, e)
+                if errors >= BATCH_MAX_POLL_ERRORS:
+                    raise
+                continue
+            errors = 0
+            if job.state.name in BATCH_DONE_STATES:
+                return job
+    
+    async def _warmup_gemini(self):
+        """Open a pooled connection to the Gemini API with a cheap model listing"""
+        if not self._has_nano_banana:
+            return
+        started = time.monotonic()
+        try:
+            await self.ai_clients['nano_banana'].aio.models.list()
+            logger.info("Gemini warmup: %.0f ms", (time.monotonic() - started) * 1000)
+        except Exception as e:
+            logger.warning("Gemini warmup failed: %s", e)
+    
+    async def _warmup_openai(self):
+        """Open a pooled connection to the OpenAI API with a cheap model listing"""
+        if not self._has_openai:
+            return
+        started = time.monotonic()
+        try:
+            await self.ai_clients['openai'].models.list()
+            logger.info("OpenAI warmup: %.0f ms", (time.monotonic() - started) * 1000)
         except Exception as e:
-            logger.error(f"Sync error: {e}")
+            logger.warning("OpenAI warmup failed: %s", e)
+    
+    async def close(self):
+        """Save the response cache and close the provider HTTP clients along with the Discord connection"""
+        if self.is_closed():
+            return
+        try:
+            if self._cache_save_task is not None:
+                self._cache_save_task.cancel()
+            await self._save_response_cache()
+            if self._http is not None:
+                try:
+                    await self._http.aclose()
+                except Exception as e:
+                    logger.warning("HTTP client close error: %s", e)
+        finally:
+            await super().close()
     
     async def on_ready(self):
-        logger.info(f'{self.user} connected! Modern Weave™ system active')
-        logger.info(f"Enterprise services: {list(self.ai_clients.keys())}")
-        logger.info(f"Nano Banana: {NANO_BANANA_AVAILABLE}")
+        logger.info("%s connected! Modern Weave™ system active", self.user)
+        logger.info("Enterprise services: %s", list(self.ai_clients.keys()))
+        logger.info("Nano Banana: %s", self._has_nano_banana)
         await self.change_presence(activity=discord.Activity(type=discord.ActivityType.watching, name="STAFFVIRTUAL enterprise operations"))
 
 # Bot instance
 bot = SVDiscordBot()
 
-# ===== ENTERPRISE CONTENT CREATION =====
+# ===== RATE LIMITING =====
 
-@bot.tree.command(name="content", description="📝 Enterprise blog posts with SEO and paired images")
-async def cmd_content_enterprise(interaction: discord.Interaction, content_type: str, topic: str, keywords: str = "", include_image: bool = True):
-    """Enterprise content creation with Modern Weave™ branding"""
-    await interaction.response.defer(thinking=True)
-    
-    try:
-        system_context = """
-        You are a senior content strategist and enterprise marketing expert for STAFFVIRTUAL.
-        
-        Expertise:
-        - B2B enterprise content marketing for virtual staffing industry
-        - Modern Weave™ brand system implementation
-        - Executive-level thought leadership content
-        - SEO optimization for enterprise keywords
-        - Competitive positioning against Belay, Time Etc, TaskUs
-        """
-        
-        enhanced_prompt = f"""
-        Create comprehensive {content_type} for STAFFVIRTUAL about: {topic}
-        Target Keywords: {keywords if keywords else 'managed virtual teams, offshore CX pod, enterprise outsourcing, virtual staffing'}
-        
-        ENTERPRISE CONTENT REQUIREMENTS:
-        
-        1. COMPREHENSIVE LENGTH: 2500-4000 words for blog posts
-        2. EXECUTIVE POSITIONING: Target COOs, CTOs, CMOs, Heads of Operations
-        3. MODERN WEAVE™ BRAND INTEGRATION:
-           - Use institutional clarity with cultural warmth
-           - Reference Filipino craftsmanship and heritage
-           - Emphasize managed delivery vs marketplace approach
-           - Include enterprise governance and SLA focus
-        
-        4. ADVANCED SEO STRATEGY:
-           - Primary keyword in title, first 100 words, and conclusion
-           - Secondary keywords naturally integrated throughout
-           - Long-tail enterprise keywords (managed virtual teams, offshore CX pod)
-           - Meta title and description optimized for enterprise search intent
-           - Header structure optimized for featured snippets
-           - Internal linking opportunities to STAFFVIRTUAL service pages
-        
-        5. ENTERPRISE CONTENT STRUCTURE:
-           - Executive Summary (key outcomes and ROI upfront)
-           - Market Context and Industry Challenges
-           - Problem Analysis (enterprise pain points and constraints)
-           - STAFFVIRTUAL Solution Framework (capability towers, engagement models)
-           - Competitive Differentiation (vs Belay, Time Etc, TaskUs)
-           - Implementation Methodology (pod deployment, governance, SLAs)
-           - ROI Analysis and Business Case
-           - Case Study or Success Story (with metrics)
-           - Strategic Recommendations and Next Steps
-           - Executive Call-to-Action (pilot pod, SOW scoping, fit assessment)
-        
-        6. PROOF POINTS TO INCLUDE:
-           - Specific metrics and ROI data
-           - SLA attainment and quality scorecards
-           - Ramp timelines and time-to-productivity
-           - Security and compliance frameworks
-           - Team composition and governance structures
-        
-        Create authoritative, evidence-based content that positions STAFFVIRTUAL as the premium enterprise choice.
-        """
-        
-        # Generate comprehensive content
-        logger.info(f"Generating enterprise content: {topic}")
-        content_result = await bot._get_ai_response(enhanced_prompt, system_context)
-        
-        # Extract enterprise SEO keywords
-        seo_keywords = await bot._extract_seo_keywords(content_result)
-        
-        # Generate Modern Weave™ branded image
-        image_result = None
-        if include_image and NANO_BANANA_AVAILABLE:
-            image_prompt = f"Modern Weave™ branded header image for STAFFVIRTUAL enterprise article about {topic}. Grid-driven layout, Filipino craftsmanship motifs, documentary-style photography. Professional, clean, enterprise-grade visual suitable for executive audiences."
-            image_result = await bot._generate_nano_banana_image(image_prompt, "enterprise")
-        
-        # Create enterprise-grade embed
-        embed = discord.Embed(
-            title="📝 STAFFVIRTUAL Enterprise Content Created!",
-            description=f"**Type:** {content_type}\n**Topic:** {topic}\n**Length:** {len(content_result)} characters\n**Modern Weave™ Optimized:** ✅",
-            color=bot.brand_config['primary_color']
-        )
-        
-        # Add enterprise SEO analysis
-        if seo_keywords:
-            embed.add_field(
-                name="🔍 Enterprise SEO Keywords",
-                value=", ".join(seo_keywords[:10]),
-                inline=False
-            )
-        
-        # Create comprehensive enterprise content file
-        seo_analysis = f"""
+def ratelimit(tokens: int = 5, refill_per_sec: float = 0.1):
+    """Per-user, per-command token bucket; replies ephemerally instead of running the command when empty"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            retry_after = bot._take_rate_limit_token((interaction.user.id, func.__name__), tokens, refill_per_sec)
+            if retry_after:
+                await interaction.response.send_message(
+                    f"⏳ Rate limit reached — try again in {math.ceil(retry_after)}s", ephemeral=True
+                )
+                return
+            return await func(interaction, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# ===== ERROR HANDLING =====
+
+def handle_errors(label: str, reply_prefix: str = "❌ Error"):
+    """Log a command's unhandled exception with its traceback and report it in the command's reply"""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(interaction: discord.Interaction, *args, **kwargs):
+            try:
+                return await func(interaction, *args, **kwargs)
+            except Exception as e:
+                logger.exception("%s error", label)
+                if interaction.response.is_done():
+                    await interaction.edit_original_response(content=f"{reply_prefix}: {e}", embed=None, attachments=[])
+                else:
+                    await interaction.response.send_message(f"{reply_prefix}: {e}")
+        return wrapper
+    return decorator
+
+# ===== EMBED TEMPLATES =====
+
+CONTENT_EMBED = EmbedTemplate(
+    title="📝 STAFFVIRTUAL Enterprise Content Created!",
+    description="**Type:** {content_type}\n**Topic:** {topic}\n**Length:** {length} characters\n**Modern Weave™ Optimized:** ✅",
+    color=bot.brand_config.primary_color
+)
+
+TEST_EMBED = EmbedTemplate(
+    title="✅ STAFFVIRTUAL Enterprise Marketing Suite",
+    description="Modern Weave™ brand system active • Enterprise AI agents ready",
+    color=bot.brand_config.primary_color,
+    fields=[
+        ("🤖 AI Services", "Available: {services}"),
+        ("🍌 Nano Banana", "{nano_banana}"),
+        ("🗄️ Response Cache", "{hits} hits • {semantic_hits} semantic hits • {misses} misses • {cached} cached"),
+        ("🎨 Brand System", "Modern Weave™ • Filipino Heritage • Enterprise Grade"),
+        ("🏢 Positioning", "Premium enterprise virtual talent partner")
+    ]
+)
+
+BATCH_EMBED = EmbedTemplate(
+    title="🗂️ STAFFVIRTUAL Batch Queued",
+    description="**{count}** {content_type} articles queued at batch pricing. Each is posted here as a downloadable file when the batch completes (usually well under 24 hours). If the bot restarts before then, the results are not posted; run the topics again.",
+    color=bot.brand_config.primary_color,
+    fields=[
+        ("📝 Topics", "{topics}"),
+        ("🆔 Job", "`{job}`")
+    ]
+)
+
+HELP_EMBED = EmbedTemplate(
+    title="🤖 STAFFVIRTUAL Enterprise Marketing Suite",
+    description="Modern Weave™ brand system • Premium AI agents for enterprise content",
+    color=bot.brand_config.primary_color,
+    fields=[
+        ("🎨 Enterprise Content Creation", "• `/content` - Blog posts with SEO + Modern Weave™ images\n• `/content_batch` - Several comma-separated topics at batch pricing, posted when ready\n• `/image` - Nano Banana generation with brand system"),
+        ("💡 Example Commands", "`/content blog 'Enterprise Virtual Team Management' 'managed virtual teams, offshore CX pod' include_image:True`"),
+        ("🏢 Brand System", "Modern Weave™ • Filipino Heritage • Enterprise Positioning • Institutional Clarity")
+    ],
+    footer="Enterprise-grade marketing intelligence • Carefully Woven, Built to Scale"
+)
+
+# SEO analysis section of the /content document, filled with a single format_map pass
+SEO_ANALYSIS_TEMPLATE = """
 ## Enterprise SEO Analysis
-- **Content Length:** {len(content_result)} characters (Enterprise standard: 2500+ words)
+- **Content Length:** {length} characters (Enterprise standard: 2500+ words)
 - **Target Audience:** COOs, CTOs, CMOs, Heads of Operations
-- **Primary Keywords:** {keywords if keywords else 'Enterprise virtual staffing'}
-- **Extracted Keywords:** {', '.join(seo_keywords)}
+- **Primary Keywords:** {keywords}
+- **Extracted Keywords:** {extracted}
 - **Brand System:** Modern Weave™ integrated
 - **Competitive Positioning:** vs Belay, Time Etc, TaskUs
 - **Optimization Status:** ✅ Enterprise SEO Optimized
@@ -492,7 +1149,7 @@ async def cmd_content_enterprise(interaction: discord.Interaction, content_type:
 - **Positioning:** Premium enterprise virtual talent partner
 - **Heritage:** Filipino craftsmanship and respect
 - **Governance:** SLA-driven, QA-managed delivery model
-- **Image Pairing:** {'✅ Modern Weave™ branded image generated' if image_result and image_result.get('success') else '❌ Image generation not available'}
+- **Image Pairing:** {image_pairing}
 
 ## Enterprise Messaging Framework
 - Outcome-first, evidence-backed content
@@ -501,105 +1158,288 @@ async def cmd_content_enterprise(interaction: discord.Interaction, content_type:
 - Filipino heritage as competitive differentiator
 - Modern Weave™ visual identity integration
         """
+
+# ===== SHARED DOCUMENT RENDERING =====
+
+def _preview_field_name(index: int, count: int, truncated: bool) -> str:
+    """Field title for preview chunk `index` of `count`"""
+    if count == 1 and not truncated:
+        return "📋 Complete Content"
+    if index == 0:
+        return "📋 Executive Summary"
+    return "📋 Content Preview" if truncated else "📋 Content Continuation"
+
+def _add_chunked_fields(embed: discord.Embed, text: str, *, field_name_fn, limit: int = 1000, max_fields: int = 2) -> bool:
+    """Add text as up to max_fields embed fields cut at line breaks; return True if text remains"""
+    chunks, consumed = _split_at_breaks(text, limit, max_fields)
+    truncated = consumed < len(text)
+    for index, chunk in enumerate(chunks):
+        embed.add_field(name=field_name_fn(index, len(chunks), truncated), value=chunk, inline=False)
+    return truncated
+
+def _add_preview_fields(embed: discord.Embed, result: str):
+    """Smart preview handling for enterprise content: at most two fields, cut at line breaks"""
+    if _add_chunked_fields(embed, result, field_name_fn=_preview_field_name):
+        embed.add_field(name="📄 Complete Enterprise Content", value="See attached file for full article with Modern Weave™ brand analysis", inline=False)
+
+def _content_prompt(content_type: str, topic: str, keywords: str) -> str:
+    """The /content request prompt for one topic"""
+    return CONTENT_PROMPT_TEMPLATE.format_map({
+        'content_type': content_type,
+        'topic': topic,
+        'keywords': keywords or 'managed virtual teams, offshore CX pod, enterprise outsourcing, virtual staffing',
+    })
+
+def _content_semantic_scope(content_type: str, topic: str):
+    """Semantic cache scope for /content: near-duplicates must share the content type and exact topic words"""
+    return content_type.strip().lower(), sorted(set(re.findall(r'\w+', topic.lower())))
+
+def _content_artifacts(content_type: str, topic: str, keywords: str, content_result: str, seo_keywords, image_result=None):
+    """Build the /content embed (without preview fields), markdown document and its filename"""
+    embed = CONTENT_EMBED.build(content_type=content_type, topic=topic, length=len(content_result))
+    
+    # Add enterprise SEO analysis
+    if seo_keywords:
+        embed.add_field(
+            name="🔍 Enterprise SEO Keywords",
+            value=", ".join(seo_keywords[:10]),
+            inline=False
+        )
+    
+    # Create comprehensive enterprise content file
+    seo_analysis = SEO_ANALYSIS_TEMPLATE.format_map({
+        'length': len(content_result),
+        'keywords': keywords or 'Enterprise virtual staffing',
+        'extracted': ', '.join(seo_keywords),
+        'image_pairing': '✅ Modern Weave™ branded image generated' if image_result and image_result.get('success') else '❌ Image generation not available',
+    })
+    
+    document = f"# STAFFVIRTUAL Enterprise {content_type.title()}: {topic}\n\n{seo_analysis}\n\n## Executive Content\n\n{content_result}".encode('utf-8')
+    filename = f"STAFFVIRTUAL_enterprise_{_safe_filename(content_type)}_{_safe_filename(topic)}.md"
+    return embed, document, filename
+
+async def _render_doc(interaction: discord.Interaction, embed: discord.Embed, result: str, document: bytes,
+                      filename: str, image_result=None, image_filename: str = None):
+    """Attach preview fields, the downloadable document and optional image, replacing the skeleton reply"""
+    # Create downloadable enterprise file (a fresh BytesIO starts at position 0)
+    file = discord.File(io.BytesIO(document), filename=filename)
+    
+    _add_preview_fields(embed, result)
+    
+    # Send with Modern Weave™ branded image
+    if image_result and image_result.get('success') and image_result.get('image_bytes'):
+        image_file = discord.File(io.BytesIO(image_result['image_bytes']), filename=image_filename)
+        embed.set_thumbnail(url=f"attachment://{image_filename}")
+        embed.add_field(name="🎨 Modern Weave™ Image", value="Enterprise-grade branded header image generated and attached", inline=False)
         
-        full_content = f"# STAFFVIRTUAL Enterprise {content_type.title()}: {topic}\n\n{seo_analysis}\n\n## Executive Content\n\n{content_result}"
+        await interaction.edit_original_response(embed=embed, attachments=[file, image_file])
+    else:
+        await interaction.edit_original_response(embed=embed, attachments=[file])
+
+def _skeleton_embed(description: str = "") -> discord.Embed:
+    """Placeholder embed shown while a command is generating"""
+    return discord.Embed(title="✍️ Generating...", description=description, color=bot.brand_config.primary_color)
+
+async def _edit_stream_preview(interaction: discord.Interaction, text: str):
+    """Show the latest streamed text in the original reply as a branded embed"""
+    embed = _skeleton_embed(text[-4000:])
+    try:
+        await interaction.edit_original_response(content=None, embed=embed)
+    except discord.HTTPException as e:
+        logger.warning("Stream preview edit failed: %s", e)
+
+async def _stream_to_interaction(interaction: discord.Interaction, prompt: str, system_context: str = "",
+                                 semantic_key: str = None, use_cache: bool = True, semantic_scope=None) -> str:
+    """Stream an AI response into the original reply as a rolling preview and return the full text"""
+    chunks = []
+    last_edit = 0.0
+    edit_task = None
+    try:
+        async for delta in bot._stream_ai_response(prompt, system_context, semantic_key, use_cache, semantic_scope):
+            chunks.append(delta)
+            now = time.monotonic()
+            # Edit in the background and never queue a second edit behind a slow one,
+            # so Discord latency does not throttle how fast the stream is consumed
+            if now - last_edit >= STREAM_EDIT_INTERVAL and (edit_task is None or edit_task.done()):
+                last_edit = now
+                edit_task = asyncio.ensure_future(_edit_stream_preview(interaction, "".join(chunks)))
+    except BaseException:
+        # Drop the pending preview so it cannot land on top of the error reply
+        if edit_task is not None:
+            edit_task.cancel()
+        raise
+    if edit_task is not None:
+        # The final render replaces the preview, so no separate "complete" edit is needed
+        await edit_task
+    return "".join(chunks)
+
+# ===== ENTERPRISE CONTENT CREATION =====
+
+@bot.tree.command(name="content", description="📝 Enterprise blog posts with SEO and paired images")
+@ratelimit(tokens=5, refill_per_sec=0.1)
+@handle_errors("Enterprise content")
+async def cmd_content_enterprise(interaction: discord.Interaction, content_type: str, topic: str, keywords: str = "", include_image: bool = True, no_cache: bool = False):
+    """Enterprise content creation with Modern Weave™ branding"""
+    # Reply with a skeleton immediately; streaming and the final render edit it in place
+    await interaction.response.send_message(embed=_skeleton_embed())
+    
+    image_task = None
+    try:
+        enhanced_prompt = _content_prompt(content_type, topic, keywords)
         
-        # Create downloadable enterprise file
-        file_buffer = io.BytesIO(full_content.encode('utf-8'))
-        file = discord.File(file_buffer, filename=f"STAFFVIRTUAL_enterprise_{content_type}_{topic.replace(' ', '_')}.md")
+        # Generate the Modern Weave™ branded image alongside the text; it only depends on the topic
+        if include_image and bot._has_nano_banana:
+            image_prompt = CONTENT_IMAGE_PROMPT_TEMPLATE.format_map({'topic': topic})
+            image_task = asyncio.ensure_future(bot._generate_nano_banana_image(image_prompt, "enterprise", use_cache=not no_cache))
         
-        # Smart preview handling for enterprise content
-        if len(content_result) > 1000:
-            embed.add_field(name="📋 Executive Summary", value=content_result[:1000], inline=False)
-            if len(content_result) > 2000:
-                embed.add_field(name="📋 Content Preview", value=content_result[1000:2000], inline=False)
-                embed.add_field(name="📄 Complete Enterprise Content", value="See attached file for full article with Modern Weave™ brand analysis", inline=False)
-            else:
-                embed.add_field(name="📋 Content Continuation", value=content_result[1000:], inline=False)
-        else:
-            embed.add_field(name="📋 Complete Content", value=content_result, inline=False)
+        # Generate comprehensive content
+        logger.info("Generating enterprise content: %s", topic)
+        content_result = await _stream_to_interaction(
+            interaction, enhanced_prompt, CONTENT_SYSTEM_CONTEXT,
+            semantic_key=f"{content_type}: {topic} | {keywords}",
+            semantic_scope=_content_semantic_scope(content_type, topic),
+            use_cache=not no_cache
+        )
         
-        # Send with Modern Weave™ branded image
-        if image_result and image_result.get('success') and image_result.get('image_path'):
-            image_file = discord.File(image_result['image_path'], filename=f"STAFFVIRTUAL_modern_weave_{topic.replace(' ', '_')}.png")
-            embed.set_thumbnail(url=f"attachment://STAFFVIRTUAL_modern_weave_{topic.replace(' ', '_')}.png")
-            embed.add_field(name="🎨 Modern Weave™ Image", value="Enterprise-grade branded header image generated and attached", inline=False)
-            
-            await interaction.followup.send(embed=embed, files=[file, image_file])
+        # Extract enterprise SEO keywords
+        seo_keywords = await bot._extract_seo_keywords(content_result)
+        
+        image_result = await image_task if image_task else None
+        
+        # Create enterprise-grade embed and content file
+        embed, document, filename = _content_artifacts(content_type, topic, keywords, content_result, seo_keywords, image_result)
+        
+        await _render_doc(
+            interaction,
+            embed,
+            content_result,
+            document,
+            filename=filename,
+            image_result=image_result,
+            image_filename=f"STAFFVIRTUAL_modern_weave_{_safe_filename(topic)}.png"
+        )
             
+    finally:
+        # Only still pending if text generation failed
+        if image_task:
+            image_task.cancel()
+
+# ===== BATCH CONTENT CREATION =====
+
+async def _deliver_batch(channel, job_name: str, content_type: str, keywords: str, topics, prompts):
+    """Wait for a /content_batch job, then post each article to the channel and cache it for /content"""
+    try:
+        job = await bot._wait_for_batch(job_name)
+        if job.state.name != 'JOB_STATE_SUCCEEDED':
+            await channel.send(f"❌ Batch `{job_name}` ended with {job.state.name}")
+            return
+        
+        for topic, prompt, response in zip(topics, prompts, job.dest.inlined_responses):
+            # Each article is delivered on its own so one bad response does not drop the rest of the batch
             try:
-                os.unlink(image_result['image_path'])
-            except:
-                pass
-        else:
-            await interaction.followup.send(embed=embed, file=file)
-            
+                content_result = response.response.text if response.response and not response.error else None
+                if not content_result:
+                    await channel.send(f"❌ Batch article failed for **{topic}**: {response.error or 'empty or blocked response'}")
+                    continue
+                # A later interactive /content for the same topic is served from the cache
+                bot._store_response(_request_key(prompt, CONTENT_SYSTEM_CONTEXT, None), content_result)
+                
+                seo_keywords = await bot._extract_seo_keywords(content_result)
+                embed, document, filename = _content_artifacts(content_type, topic, keywords, content_result, seo_keywords)
+                _add_preview_fields(embed, content_result)
+                await channel.send(embed=embed, file=discord.File(io.BytesIO(document), filename=filename))
+            except Exception as e:
+                logger.exception("Batch %s article error for %s", job_name, topic)
+                try:
+                    await channel.send(f"❌ Batch article failed for **{topic}**: {e}")
+                except discord.HTTPException as send_error:
+                    logger.warning("Batch %s failure notice failed: %s", job_name, send_error)
     except Exception as e:
-        logger.error(f"Enterprise content error: {e}")
-        await interaction.followup.send(f"❌ Error: {str(e)}")
+        logger.exception("Batch %s delivery error", job_name)
+        try:
+            await channel.send(f"❌ Batch `{job_name}` could not be delivered: {e}")
+        except discord.HTTPException as send_error:
+            logger.warning("Batch %s failure notice failed: %s", job_name, send_error)
+
+@bot.tree.command(name="content_batch", description="🗂️ Queue several comma-separated topics at batch pricing")
+@ratelimit(tokens=2, refill_per_sec=0.01)
+@handle_errors("Batch content")
+async def cmd_content_batch(interaction: discord.Interaction, content_type: str, topics: str, keywords: str = ""):
+    """Queue topics as one Gemini Batch Mode job; articles are posted to the channel as they complete"""
+    topic_list = [topic.strip() for topic in topics.split(',') if topic.strip()]
+    if not bot._has_nano_banana:
+        await interaction.response.send_message("❌ Batch mode needs the Gemini (google-genai) client.", ephemeral=True)
+        return
+    if not topic_list or len(topic_list) > BATCH_MAX_TOPICS:
+        await interaction.response.send_message(f"❌ Give between 1 and {BATCH_MAX_TOPICS} comma-separated topics.", ephemeral=True)
+        return
+    if interaction.channel is None:
+        await interaction.response.send_message("❌ Batch results are posted to a channel; run this in one.", ephemeral=True)
+        return
+    
+    await interaction.response.send_message(embed=_skeleton_embed())
+    
+    prompts = [_content_prompt(content_type, topic, keywords) for topic in topic_list]
+    job_name = await bot._submit_batch(prompts, CONTENT_SYSTEM_CONTEXT, display_name=f"sv_batch_{interaction.channel_id}")
+    
+    task = asyncio.ensure_future(_deliver_batch(interaction.channel, job_name, content_type, keywords, topic_list, prompts))
+    bot._batch_tasks.add(task)
+    task.add_done_callback(bot._batch_tasks.discard)
+    
+    await interaction.edit_original_response(embed=BATCH_EMBED.build(
+        count=len(topic_list), content_type=content_type, job=job_name, topics=_preview("\n".join(f"• {topic}" for topic in topic_list), EMBED_FIELD_MAX - 3)
+    ))
 
 # Add other essential commands...
 
+@bot.command(name="reload_brand")
+@commands.is_owner()
+async def cmd_reload_brand(ctx: commands.Context):
+    """Reload brand/brand_dna.txt and clear responses generated with the old brand DNA"""
+    try:
+        bot.reload_brand_dna()
+    except OSError as e:
+        await ctx.send(f"❌ Could not read brand DNA: {e}")
+        return
+    await ctx.send(f"✅ Brand DNA reloaded ({len(bot.brand_dna)} characters); response caches cleared")
+
 @bot.tree.command(name="test", description="🧪 Test enterprise system functionality")
+@handle_errors("Test", reply_prefix="❌ Test failed")
 async def cmd_test(interaction: discord.Interaction):
-    try:
-        embed = discord.Embed(
-            title="✅ STAFFVIRTUAL Enterprise Marketing Suite",
-            description="Modern Weave™ brand system active • Enterprise AI agents ready",
-            color=bot.brand_config['primary_color']
-        )
-        embed.add_field(name="🤖 AI Services", value=f"Available: {list(bot.ai_clients.keys())}", inline=False)
-        embed.add_field(name="🍌 Nano Banana", value=f"{'✅ Available' if NANO_BANANA_AVAILABLE else '❌ Legacy mode'}", inline=False)
-        embed.add_field(name="🎨 Brand System", value="Modern Weave™ • Filipino Heritage • Enterprise Grade", inline=False)
-        embed.add_field(name="🏢 Positioning", value="Premium enterprise virtual talent partner", inline=False)
-        
-        await interaction.response.send_message(embed=embed)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ Test failed: {str(e)}")
+    embed = TEST_EMBED.build(
+        services=list(bot.ai_clients.keys()),
+        nano_banana='✅ Available' if bot._has_nano_banana else '❌ Legacy mode',
+        cached=len(bot._response_cache),
+        **bot.cache_stats
+    )
+    
+    await interaction.response.send_message(embed=embed)
 
 @bot.tree.command(name="help", description="❓ Show enterprise marketing suite commands")
+@handle_errors("Help")
 async def cmd_help(interaction: discord.Interaction):
-    try:
-        embed = discord.Embed(
-            title="🤖 STAFFVIRTUAL Enterprise Marketing Suite",
-            description="Modern Weave™ brand system • Premium AI agents for enterprise content",
-            color=bot.brand_config['primary_color']
-        )
-        
-        embed.add_field(
-            name="🎨 Enterprise Content Creation",
-            value="• `/content` - Blog posts with SEO + Modern Weave™ images\n• `/image` - Nano Banana generation with brand system",
-            inline=False
-        )
-        
-        embed.add_field(
-            name="💡 Example Commands",
-            value="`/content blog 'Enterprise Virtual Team Management' 'managed virtual teams, offshore CX pod' include_image:True`",
-            inline=False
-        )
-        
-        embed.add_field(
-            name="🏢 Brand System",
-            value="Modern Weave™ • Filipino Heritage • Enterprise Positioning • Institutional Clarity",
-            inline=False
-        )
-        
-        embed.set_footer(text="Enterprise-grade marketing intelligence • Carefully Woven, Built to Scale")
-        
-        await interaction.response.send_message(embed=embed)
-    except Exception as e:
-        await interaction.response.send_message(f"❌ Error: {str(e)}")
+    embed = HELP_EMBED.build()
+    
+    await interaction.response.send_message(embed=embed)
 
 # Run the bot
 if __name__ == "__main__":
-    token = os.getenv('DISCORD_BOT_TOKEN')
+    token = _ENV.get('DISCORD_BOT_TOKEN')
     if not token:
         logger.error("DISCORD_BOT_TOKEN not found")
         exit(1)
     
+    # uvloop (libuv) speeds up discord.py's socket and HTTP handling; not available on Windows
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        logger.info("Using uvloop event loop")
+    except ImportError:
+        pass
+    
     try:
         logger.info("Starting STAFFVIRTUAL Enterprise Marketing Suite with Modern Weave™...")
         bot.run(token)
     except Exception as e:
-        logger.error(f"Bot startup error: {e}")
+        logger.exception("Bot startup error: %s", e)
         exit(1)
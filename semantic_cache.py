@@ -0,0 +1,114 @@
+import logging
+import time
+import zlib
+from typing import List, Optional, Sequence
+
+# Optional imports - the semantic cache is disabled without numpy
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# lz4 is faster than zlib at similar ratios for short English text; zlib is the stdlib fallback
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_CACHE_AVAILABLE = np is not None
+
+def compress_text(text: str) -> bytes:
+    """Compress a cached response for storage"""
+    data = text.encode('utf-8')
+    return lz4_frame.compress(data) if lz4_frame else zlib.compress(data, 1)
+
+def decompress_text(blob: bytes) -> str:
+    """Restore a response stored with compress_text"""
+    data = lz4_frame.decompress(blob) if lz4_frame else zlib.decompress(blob)
+    return data.decode('utf-8')
+
+class SemanticCache:
+    """Embedding-similarity cache that reuses responses for near-duplicate requests"""
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 2000, ttl: float = 24 * 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl                # seconds before an entry is treated as stale
+        self._vectors = None          # (N, D) float32 matrix of unit-length embeddings
+        self._responses: List[bytes] = []  # compressed with compress_text
+        self._last_used = None        # (N,) int64 access ticks for LRU eviction
+        self._stored_at = None        # (N,) float64 monotonic store times for TTL expiry
+        self._tick = 0
+
+    def __len__(self):
+        return len(self._responses)
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]):
+        """Convert an embedding to a unit-length float32 array so lookup is a single matmul"""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def prune(self):
+        """Drop entries older than the TTL so their responses are freed, not just skipped"""
+        if not self._responses:
+            return
+        fresh = self._stored_at >= time.monotonic() - self.ttl
+        if fresh.all():
+            return
+        self._vectors = self._vectors[fresh]
+        self._responses = [blob for blob, keep in zip(self._responses, fresh) if keep]
+        self._last_used = self._last_used[fresh]
+        self._stored_at = self._stored_at[fresh]
+
+    def lookup(self, vector: Sequence[float]) -> Optional[str]:
+        """Return the cached response most similar to the embedding, if above the threshold"""
+        self.prune()
+        if not self._responses:
+            return None
+
+        query = self._normalize(vector)
+        if query.shape[0] != self._vectors.shape[1]:
+            return None
+
+        scores = self._vectors @ query
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+
+        self._tick += 1
+        self._last_used[best] = self._tick
+        logger.info("Semantic cache hit (similarity %.3f)", scores[best])
+        return decompress_text(self._responses[best])
+
+    def add(self, vector: Sequence[float], response: str):
+        """Store a response under its embedding, evicting the least recently used entry when full"""
+        self.prune()
+        row = self._normalize(vector)
+        blob = compress_text(response)
+        now = time.monotonic()
+        self._tick += 1
+
+        if not self._responses or row.shape[0] != self._vectors.shape[1]:
+            # First entry, or the embedding model changed: start a fresh matrix
+            self._vectors = row[np.newaxis, :]
+            self._responses = [blob]
+            self._last_used = np.array([self._tick], dtype=np.int64)
+            self._stored_at = np.array([now], dtype=np.float64)
+            return
+
+        if len(self._responses) >= self.max_entries:
+            oldest = int(self._last_used.argmin())
+            self._vectors[oldest] = row
+            self._responses[oldest] = blob
+            self._last_used[oldest] = self._tick
+            self._stored_at[oldest] = now
+            return
+
+        self._vectors = np.vstack([self._vectors, row])
+        self._responses.append(blob)
+        self._last_used = np.append(self._last_used, self._tick)
+        self._stored_at = np.append(self._stored_at, now)